@@ -0,0 +1,124 @@
+"""
+候选位置筛选与评分的 Numba 加速内核
+
+需要安装 numba；未安装时 placement_solver 会退回 numpy 实现。
+"""
+import math
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def _point_box_distance(px, py, minx, miny, maxx, maxy):
+    """点到轴对齐矩形的距离"""
+    gap_x = max(minx - px, px - maxx, 0.0)
+    gap_y = max(miny - py, py - maxy, 0.0)
+    return math.hypot(gap_x, gap_y)
+
+
+@njit(cache=True)
+def _point_segment_distance(px, py, x0, y0, dx, dy, length_sq):
+    """点到线段的距离"""
+    t = 0.0
+    if length_sq > 0:
+        t = min(max(((px - x0) * dx + (py - y0) * dy) / length_sq, 0.0), 1.0)
+    return math.hypot(x0 + t * dx - px, y0 + t * dy - py)
+
+
+@njit(cache=True)
+def _segment_box_distance(x0, y0, x1, y1, minx, miny, maxx, maxy):
+    """线段到轴对齐矩形的距离，与 segment_to_aabb_distance 的单元素结果一致"""
+    dx, dy = x1 - x0, y1 - y0
+
+    # 线段穿过矩形时距离为0（Liang-Barsky 裁剪）
+    t_enter, t_exit = 0.0, 1.0
+    crosses = True
+    for k in range(4):
+        if k == 0:
+            p, q = -dx, x0 - minx
+        elif k == 1:
+            p, q = dx, maxx - x0
+        elif k == 2:
+            p, q = -dy, y0 - miny
+        else:
+            p, q = dy, maxy - y0
+        if p == 0:
+            if q < 0:
+                crosses = False
+        elif p < 0:
+            t_enter = max(t_enter, q / p)
+        else:
+            t_exit = min(t_exit, q / p)
+    if crosses and t_enter <= t_exit:
+        return 0.0
+
+    # 不相交时最短距离必在线段端点到矩形、或矩形角点到线段之间取得
+    length_sq = dx * dx + dy * dy
+    dist = min(_point_box_distance(x0, y0, minx, miny, maxx, maxy),
+               _point_box_distance(x1, y1, minx, miny, maxx, maxy))
+    dist = min(dist, _point_segment_distance(minx, miny, x0, y0, dx, dy, length_sq))
+    dist = min(dist, _point_segment_distance(maxx, miny, x0, y0, dx, dy, length_sq))
+    dist = min(dist, _point_segment_distance(maxx, maxy, x0, y0, dx, dy, length_sq))
+    dist = min(dist, _point_segment_distance(minx, maxy, x0, y0, dx, dy, length_sq))
+    return dist
+
+
+@njit(parallel=True, cache=True)
+def evaluate_candidates(cand_aabbs, source_walls, placed_aabbs, item_aabbs, boundary_aabb,
+                        wall_segments, tol):
+    """对候选包围盒 (C, 4) 一次性完成重叠筛选与评分特征计算
+
+    source_walls 为每个候选的来源墙编号（内部采样为 -1），与来源墙的距离按构造为0，不再计算；
+    placed_aabbs 为已摆放物品与冰箱开门边禁区，item_aabbs 仅含已摆放物品，
+    boundary_aabb 为边界包围盒，wall_segments 为 (W, 4) 墙面端点。
+    返回 (valid, touching_walls, touching_items, min_wall_distance)；
+    valid 只表示通过包围盒层面的检查，边界精确包含与门禁区仍需另行判断。
+    """
+    n = cand_aabbs.shape[0]
+    valid = np.zeros(n, dtype=np.bool_)
+    touching_walls = np.zeros(n, dtype=np.int64)
+    touching_items = np.zeros(n, dtype=np.int64)
+    min_wall_distance = np.full(n, np.inf)
+
+    for i in prange(n):
+        minx, miny = cand_aabbs[i, 0], cand_aabbs[i, 1]
+        maxx, maxy = cand_aabbs[i, 2], cand_aabbs[i, 3]
+
+        # 超出边界包围盒的一定不在边界内
+        if (minx < boundary_aabb[0]) | (miny < boundary_aabb[1]) | \
+                (maxx > boundary_aabb[2]) | (maxy > boundary_aabb[3]):
+            continue
+
+        # 与已摆放物品或冰箱开门边禁区严格重叠
+        hit = False
+        for j in range(placed_aabbs.shape[0]):
+            if (minx < placed_aabbs[j, 2]) & (maxx > placed_aabbs[j, 0]) & \
+                    (miny < placed_aabbs[j, 3]) & (maxy > placed_aabbs[j, 1]):
+                hit = True
+                break
+        if hit:
+            continue
+        valid[i] = True
+
+        # 贴墙数量与最近墙距离
+        for w in range(wall_segments.shape[0]):
+            if w == source_walls[i]:
+                d = 0.0
+            else:
+                d = _segment_box_distance(wall_segments[w, 0], wall_segments[w, 1],
+                                          wall_segments[w, 2], wall_segments[w, 3],
+                                          minx, miny, maxx, maxy)
+            if d < tol:
+                touching_walls[i] += 1
+            if d < min_wall_distance[i]:
+                min_wall_distance[i] = d
+
+        # 与已摆放物品齐平的边数
+        for k in range(item_aabbs.shape[0]):
+            gap_x = max(item_aabbs[k, 0] - maxx, minx - item_aabbs[k, 2])
+            gap_y = max(item_aabbs[k, 1] - maxy, miny - item_aabbs[k, 3])
+            if ((gap_x < tol) & (gap_y < 0)) | ((gap_y < tol) & (gap_x < 0)):
+                touching_items[i] += 1
+
+    return valid, touching_walls, touching_items, min_wall_distance
@@ -3,12 +3,93 @@
 """
 import json
 import math
-from typing import List, Tuple, Dict, Optional
-from dataclasses import dataclass
-from shapely.geometry import Polygon, Point, LineString, box
-from shapely.ops import unary_union
+from typing import Callable, List, Tuple, Dict, Optional
+from dataclasses import dataclass, field
+import shapely
+from shapely.geometry import Polygon, LineString, box
 import numpy as np
 
+# 候选位置：(中心点, 旋转角度, 来源墙编号；内部网格采样为 -1)
+Candidate = Tuple[Tuple[float, float], int, int]
+
+# Numba 内核按需加载：导入 numba 并加载编译缓存约需 0.5 秒，候选较少时得不偿失
+_numba_kernel = None  # None 表示尚未尝试加载，False 表示未安装 numba
+
+try:
+    from _overlap import any_overlap
+except ImportError:  # 未手动编译 _overlap 扩展时使用 numpy 实现（编译方法见 README）
+    any_overlap = None
+
+
+def _load_numba_kernel() -> Optional[Callable]:
+    """首次需要时导入 Numba 内核，未安装 numba 时返回 None"""
+    global _numba_kernel
+    if _numba_kernel is None:
+        try:
+            from _kernels import evaluate_candidates
+            _numba_kernel = evaluate_candidates
+        except ImportError:  # 未安装 numba 时使用 numpy 实现
+            _numba_kernel = False
+    return _numba_kernel or None
+
+
+def _point_aabb_distance(px, py, boxes: np.ndarray) -> np.ndarray:
+    """点到轴对齐矩形的距离，boxes 形状为 (C, 4)，点可广播为 (1, W)"""
+    gap_x = np.maximum(np.maximum(boxes[:, 0:1] - px, px - boxes[:, 2:3]), 0)
+    gap_y = np.maximum(np.maximum(boxes[:, 1:2] - py, py - boxes[:, 3:4]), 0)
+    return np.hypot(gap_x, gap_y)
+
+
+def segment_to_aabb_distance(segments: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """计算线段到轴对齐矩形的距离矩阵
+    
+    segments 形状为 (W, 4): [x1, y1, x2, y2]，boxes 形状为 (C, 4): [minx, miny, maxx, maxy]，
+    返回形状为 (C, W) 的距离矩阵。
+    """
+    distances = np.empty((len(boxes), len(segments)), dtype=np.float64)
+    dx = segments[:, 2] - segments[:, 0]
+    dy = segments[:, 3] - segments[:, 1]
+    axis_aligned = (dx == 0) | (dy == 0)
+    
+    # 水平/垂直墙本身就是退化的包围盒，距离为两个包围盒在两轴上间隙的合成
+    if axis_aligned.any():
+        seg = segments[axis_aligned]
+        seg_minx = np.minimum(seg[:, 0], seg[:, 2])
+        seg_maxx = np.maximum(seg[:, 0], seg[:, 2])
+        seg_miny = np.minimum(seg[:, 1], seg[:, 3])
+        seg_maxy = np.maximum(seg[:, 1], seg[:, 3])
+        gap_x = np.maximum(np.maximum(seg_minx - boxes[:, 2:3], boxes[:, 0:1] - seg_maxx), 0)
+        gap_y = np.maximum(np.maximum(seg_miny - boxes[:, 3:4], boxes[:, 1:2] - seg_maxy), 0)
+        distances[:, axis_aligned] = np.hypot(gap_x, gap_y)
+    
+    # 斜墙：不相交时最短距离必在线段端点到矩形、或矩形角点到线段之间取得
+    if not axis_aligned.all():
+        seg = segments[~axis_aligned]
+        x0, y0, x1, y1 = (seg[:, k] for k in range(4))
+        sdx, sdy = x1 - x0, y1 - y0
+        length_sq = sdx * sdx + sdy * sdy
+        
+        dist = np.minimum(_point_aabb_distance(x0, y0, boxes),
+                          _point_aabb_distance(x1, y1, boxes))
+        for cx, cy in ((boxes[:, 0:1], boxes[:, 1:2]), (boxes[:, 2:3], boxes[:, 1:2]),
+                       (boxes[:, 2:3], boxes[:, 3:4]), (boxes[:, 0:1], boxes[:, 3:4])):
+            t = np.clip(((cx - x0) * sdx + (cy - y0) * sdy) / length_sq, 0, 1)
+            dist = np.minimum(dist, np.hypot(x0 + t * sdx - cx, y0 + t * sdy - cy))
+        
+        # 线段穿过矩形时距离为0（Liang-Barsky 裁剪）
+        t_enter = np.zeros_like(dist)
+        t_exit = np.ones_like(dist)
+        for p, q in ((-sdx, x0 - boxes[:, 0:1]), (sdx, boxes[:, 2:3] - x0),
+                     (-sdy, y0 - boxes[:, 1:2]), (sdy, boxes[:, 3:4] - y0)):
+            ratio = q / p
+            t_enter = np.where(p < 0, np.maximum(t_enter, ratio), t_enter)
+            t_exit = np.where(p > 0, np.minimum(t_exit, ratio), t_exit)
+        dist[t_enter <= t_exit] = 0
+        
+        distances[:, ~axis_aligned] = dist
+    
+    return distances
+
 
 @dataclass
 class Item:
@@ -37,15 +118,41 @@ class Placement:
         }
 
 
+@dataclass
+class CandidateFrame:
+    """一个物品的候选评估结果，由 _next_position 依次取出最优位置"""
+    positions: List[Candidate]
+    aabbs: np.ndarray
+    scores: np.ndarray
+    tried: List[np.ndarray] = field(default_factory=list)  # 已尝试位置的包围盒
+    pending: Optional[List[Candidate]] = None  # 尚未评估的内部候选
+    pending_bound: float = -np.inf  # 尚未评估的候选得分上界
+
+
 class PlacementSolver:
     """物体摆放求解器"""
     
+    # 距离小于该容差认为贴靠
+    TOUCH_TOLERANCE = 10
+    # 回溯时最多向前撤销的物品数
+    MAX_BACKTRACK_DEPTH = 3
+    # 每个物品最多尝试的候选位置数
+    MAX_ALTERNATIVES = 5
+    # 一次评估的候选数达到该值时才使用 Numba 内核，否则其节省的时间抵不上导入开销
+    NUMBA_MIN_CANDIDATES = 20000
+    
     def __init__(self, boundary: List[Tuple[float, float]], 
                  door: List[Tuple[float, float]],
                  is_open_inward: bool,
                  items: Dict[str, List[float]]):
         self.boundary_points = boundary
         self.boundary_polygon = Polygon(boundary)
+        self.boundary_bounds = self.boundary_polygon.bounds
+        
+        # 边界本身是轴对齐矩形时，包含判断可退化为包围盒比较
+        bminx, bminy, bmaxx, bmaxy = self.boundary_bounds
+        self.boundary_is_rect = math.isclose(
+            self.boundary_polygon.area, (bmaxx - bminx) * (bmaxy - bminy))
         self.door = door
         self.is_open_inward = is_open_inward
         self.items = self._parse_items(items)
@@ -56,6 +163,22 @@ class PlacementSolver:
         # 提取墙面
         self.walls = self._extract_walls()
         
+        # 墙面端点数组 (W, 4): [x1, y1, x2, y2]
+        self.wall_segments = np.array(
+            [wall.coords[0] + wall.coords[1] for wall in self.walls], dtype=np.float64)
+        
+        # 按墙编号索引的不变量：起点、长度、单位方向和指向室内的垂直方向
+        self.wall_px = self.wall_segments[:, 0]
+        self.wall_py = self.wall_segments[:, 1]
+        self.wall_dx = self.wall_segments[:, 2] - self.wall_px
+        self.wall_dy = self.wall_segments[:, 3] - self.wall_py
+        self.wall_len = np.hypot(self.wall_dx, self.wall_dy)
+        safe_len = np.where(self.wall_len > 0, self.wall_len, 1.0)
+        self.wall_ux = self.wall_dx / safe_len
+        self.wall_uy = self.wall_dy / safe_len
+        self.wall_perp_x = -self.wall_uy
+        self.wall_perp_y = self.wall_ux
+        
         # 已摆放的物品
         self.placements: List[Placement] = []
         self.placed_polygons: List[Polygon] = []
@@ -63,6 +186,30 @@ class PlacementSolver:
         # 冰箱开门边禁区
         self.fridge_zones: List[Polygon] = []
         
+        # 内部网格采样点缓存
+        self._interior_points: Optional[List[Tuple[float, float]]] = None
+        
+        # 已摆放物品与冰箱禁区的包围盒 (N, 4): [minx, miny, maxx, maxy]
+        self.placed_aabbs = np.empty((0, 4), dtype=np.float64)
+        
+        # 边界顶点（退化为点的包围盒），用于沿墙采样时切分可用区间
+        vertices = np.asarray(self.boundary_points, dtype=np.float64)
+        self.boundary_vertex_aabbs = np.hstack([vertices, vertices])
+        
+        # 门禁区包围盒，用于预筛选
+        self.door_aabb = self.door_restricted_zone.bounds if self.door_restricted_zone else None
+        
+        # 门禁区本身是轴对齐矩形时（轴对齐墙上的内开门），可直接用包围盒切分沿墙区间
+        self.door_is_rect = bool(self.door_restricted_zone) and math.isclose(
+            self.door_restricted_zone.area,
+            (self.door_aabb[2] - self.door_aabb[0]) * (self.door_aabb[3] - self.door_aabb[1]))
+        
+        # 原地预处理几何体：对固定的边界和门禁区反复做 contains/intersects 时更快，
+        # shapely 的向量化函数会自动使用预处理结果
+        shapely.prepare(self.boundary_polygon)
+        if self.door_restricted_zone:
+            shapely.prepare(self.door_restricted_zone)
+        
     def _parse_items(self, items_dict: Dict[str, List[float]]) -> List[Item]:
         """解析物品列表并排序"""
         items = []
@@ -132,149 +279,244 @@ class PlacementSolver:
     def _create_rectangle(self, center: Tuple[float, float], 
                          length: float, width: float, 
                          rotation: int) -> Polygon:
-        """创建旋转矩形"""
+        """创建旋转矩形（0°：length为x方向；90°：width为x方向）"""
+        return box(*self._rect_aabb(center, length, width, rotation))
+    
+    def _rect_aabb(self, center: Tuple[float, float],
+                   length: float, width: float,
+                   rotation: int) -> Tuple[float, float, float, float]:
+        """计算矩形包围盒 (minx, miny, maxx, maxy)"""
         cx, cy = center
-        
         if rotation == 0:
-            # 不旋转：length为x方向，width为y方向
-            half_l, half_w = length / 2, width / 2
-            points = [
-                (cx - half_l, cy - half_w),
-                (cx + half_l, cy - half_w),
-                (cx + half_l, cy + half_w),
-                (cx - half_l, cy + half_w)
-            ]
+            half_x, half_y = length / 2, width / 2
         else:  # rotation == 90
-            # 旋转90度：width为x方向，length为y方向
-            half_l, half_w = length / 2, width / 2
-            points = [
-                (cx - half_w, cy - half_l),
-                (cx + half_w, cy - half_l),
-                (cx + half_w, cy + half_l),
-                (cx - half_w, cy + half_l)
-            ]
-        
-        return Polygon(points)
+            half_x, half_y = width / 2, length / 2
+        return (cx - half_x, cy - half_y, cx + half_x, cy + half_y)
     
-    def _is_valid_placement(self, center: Tuple[float, float], 
-                           item: Item, rotation: int) -> bool:
-        """检查摆放位置是否有效"""
-        rect = self._create_rectangle(center, item.length, item.width, rotation)
-        
-        # 检查1：是否完全在边界内
-        if not self.boundary_polygon.contains(rect):
-            return False
+    def _rect_aabb_funcs(self, item: Item) -> Dict[int, Callable[[float, float], Tuple[float, float, float, float]]]:
+        """为物品生成按旋转角度特化的包围盒函数 {0: f, 90: f}
         
-        # 检查2：是否与门禁区重叠
-        if self.door_restricted_zone and rect.intersects(self.door_restricted_zone):
-            return False
+        半长在生成时确定，候选循环中只需按旋转角度查表调用，不再重复除法和分支。
+        """
+        half_l, half_w = item.length / 2, item.width / 2
         
-        # 检查3：是否与已摆放物品重叠
-        for placed_poly in self.placed_polygons:
-            if rect.intersects(placed_poly):
-                return False
+        def aabb_0(cx: float, cy: float) -> Tuple[float, float, float, float]:
+            return (cx - half_l, cy - half_w, cx + half_l, cy + half_w)
         
-        # 检查4：是否与冰箱开门边禁区重叠
-        for fridge_zone in self.fridge_zones:
-            if rect.intersects(fridge_zone):
-                return False
+        def aabb_90(cx: float, cy: float) -> Tuple[float, float, float, float]:
+            return (cx - half_w, cy - half_l, cx + half_w, cy + half_l)
         
-        return True
+        return {0: aabb_0, 90: aabb_90}
     
-    def _generate_wall_positions(self, wall: LineString, item: Item) -> List[Tuple[Tuple[float, float], int]]:
-        """沿墙生成候选位置"""
-        candidates = []
-        
-        # 获取墙的起点和终点
-        coords = list(wall.coords)
-        p1, p2 = coords[0], coords[1]
+    def _add_placed_aabb(self, aabb: Tuple[float, float, float, float]):
+        """追加一个包围盒到已占用数组"""
+        self.placed_aabbs = np.vstack([self.placed_aabbs, np.asarray(aabb, dtype=np.float64)])
+    
+    def _overlaps_placed(self, aabbs: np.ndarray) -> np.ndarray:
+        """批量检查候选包围盒 (C, 4) 是否与已摆放物品或冰箱开门边禁区重叠"""
+        if not len(self.placed_aabbs) or not len(aabbs):
+            return np.zeros(len(aabbs), dtype=bool)
+        
+        if any_overlap is not None:
+            return any_overlap(np.ascontiguousarray(aabbs, dtype=np.float64), self.placed_aabbs)
+        
+        # 已占用的包围盒只有十几个，直接广播成 (C, N) 做严格重叠判断（仅接触不算重叠）
+        a, b = aabbs[:, None, :], self.placed_aabbs[None, :, :]
+        strict = ((a[..., 0] < b[..., 2]) & (a[..., 2] > b[..., 0]) &
+                  (a[..., 1] < b[..., 3]) & (a[..., 3] > b[..., 1]))
+        return strict.any(axis=1)
+    
+    def _fits_room(self, aabbs: np.ndarray) -> np.ndarray:
+        """批量检查包围盒 (C, 4) 是否完全在边界内且不挡门
         
-        # 计算墙的长度和方向
-        wall_length = wall.length
-        dx = p2[0] - p1[0]
-        dy = p2[1] - p1[1]
+        门禁区与已摆放物品、冰箱开门边禁区采用同一规则：只有内部相交才算重叠，仅边界接触允许。
+        """
+        minx, miny, maxx, maxy = aabbs[:, 0], aabbs[:, 1], aabbs[:, 2], aabbs[:, 3]
         
-        # 判断墙的方向（水平或垂直）
-        is_horizontal = abs(dy) < abs(dx)
+        # 检查1：是否完全在边界内
+        if self.boundary_is_rect:
+            bminx, bminy, bmaxx, bmaxy = self.boundary_bounds
+            fits = (minx >= bminx) & (miny >= bminy) & (maxx <= bmaxx) & (maxy <= bmaxy)
+        else:
+            fits = shapely.contains(self.boundary_polygon, shapely.box(minx, miny, maxx, maxy))
+        
+        # 检查2：是否与门禁区重叠（包围盒重叠时才做精确判断）
+        if self.door_restricted_zone:
+            dminx, dminy, dmaxx, dmaxy = self.door_aabb
+            near_door = fits & (minx < dmaxx) & (maxx > dminx) & (miny < dmaxy) & (maxy > dminy)
+            if near_door.any():
+                near = aabbs[near_door]
+                near_boxes = shapely.box(near[:, 0], near[:, 1], near[:, 2], near[:, 3])
+                # 相交但只是接触（含接触门禁区的弧形部分）时内部不相交，与包围盒预筛选的严格判断一致
+                overlap = (shapely.intersects(self.door_restricted_zone, near_boxes) &
+                           ~shapely.touches(self.door_restricted_zone, near_boxes))
+                fits[near_door] = ~overlap
+        
+        return fits
+    
+    def _wall_free_intervals(self, wall_idx: int, depth: float) -> List[Tuple[float, float]]:
+        """计算墙前深度为 depth 的条带内未被占用的区间（沿墙距离）
+        
+        障碍物包括已摆放物品、冰箱开门边禁区、门禁区，以及伸入条带的边界顶点
+        （顶点落在物品内部时物品必然越界）。门禁区不是轴对齐矩形时（斜墙上的门、外开门的圆角），
+        其包围盒会多占空间，改用门禁区与条带的交集。
+        """
+        obstacles = np.vstack([self.placed_aabbs, self.boundary_vertex_aabbs])
+        if self.door_is_rect:
+            obstacles = np.vstack([obstacles, np.asarray(self.door_aabb, dtype=np.float64)])
+        
+        wall_length = float(self.wall_len[wall_idx])
+        px, py = self.wall_px[wall_idx], self.wall_py[wall_idx]
+        ux, uy = self.wall_ux[wall_idx], self.wall_uy[wall_idx]
+        perp_x, perp_y = self.wall_perp_x[wall_idx], self.wall_perp_y[wall_idx]
+        
+        # 将障碍物包围盒的四个角投影到沿墙方向 t 和指向室内方向 s
+        xs = obstacles[:, [0, 2, 2, 0]] - px
+        ys = obstacles[:, [1, 1, 3, 3]] - py
+        t = xs * ux + ys * uy
+        s = xs * perp_x + ys * perp_y
+        in_strip = (s.max(axis=1) > 0) & (s.min(axis=1) < depth)
+        starts = t.min(axis=1)[in_strip].tolist()
+        ends = t.max(axis=1)[in_strip].tolist()
+        
+        if self.door_restricted_zone and not self.door_is_rect:
+            strip = Polygon([(px, py), (px + ux * wall_length, py + uy * wall_length),
+                             (px + ux * wall_length + perp_x * depth, py + uy * wall_length + perp_y * depth),
+                             (px + perp_x * depth, py + perp_y * depth)])
+            part = self.door_restricted_zone.intersection(strip)
+            # 只与条带边界接触（面积为0）时不占用，与 _fits_room 的规则一致
+            if part.area > 0:
+                coords = shapely.get_coordinates(part)
+                t_door = (coords[:, 0] - px) * ux + (coords[:, 1] - py) * uy
+                starts.append(float(t_door.min()))
+                ends.append(float(t_door.max()))
+        
+        # 合并占用区间并求补集
+        free = []
+        cursor = 0.0
+        for start, end in sorted(zip(starts, ends)):
+            if start > cursor:
+                free.append((cursor, min(start, wall_length)))
+            cursor = max(cursor, end)
+            if cursor >= wall_length:
+                break
+        if cursor < wall_length:
+            free.append((cursor, wall_length))
+        return free
+    
+    def _generate_wall_positions(self, wall_idx: int, item: Item) -> List[Candidate]:
+        """沿墙生成候选位置
         
-        # 采样步长 - 更密集的采样
-        step = min(100, wall_length / 20)
-        step = max(step, 1)  # 确保步长至少为1，避免除零错误
+        只在墙上未被占用的区间内取贴合区间两端、区间中点，以及从一端起每隔一个物品长度的位置，
+        相距不足一个物品长度的候选对贴墙摆放是冗余的。
+        """
+        candidates = []
         
-        # 沿墙采样位置
-        for dist in np.arange(0, wall_length, step):
-            t = dist / wall_length
-            wall_x = p1[0] + t * dx
-            wall_y = p1[1] + t * dy
+        # 读取预先计算的墙面数据
+        wall_length = float(self.wall_len[wall_idx])
+        if wall_length == 0:
+            return candidates
+        px, py = float(self.wall_px[wall_idx]), float(self.wall_py[wall_idx])
+        ux, uy = float(self.wall_ux[wall_idx]), float(self.wall_uy[wall_idx])
+        perp_x, perp_y = float(self.wall_perp_x[wall_idx]), float(self.wall_perp_y[wall_idx])
+        
+        # 尝试两种旋转方向
+        for rotation in [0, 90]:
+            half_x, half_y = (item.length / 2, item.width / 2) if rotation == 0 else (item.width / 2, item.length / 2)
             
-            # 计算垂直于墙的方向（指向室内）
-            perp_x = -dy / wall_length
-            perp_y = dx / wall_length
+            # 物品沿墙方向和垂直于墙方向的半长
+            half_along = abs(ux) * half_x + abs(uy) * half_y
+            offset = abs(perp_x) * half_x + abs(perp_y) * half_y
             
-            # 尝试两种旋转方向
-            for rotation in [0, 90]:
-                if rotation == 0:
-                    offset = item.width / 2
-                    length_along_wall = item.length
-                else:
-                    offset = item.length / 2
-                    length_along_wall = item.width
-                
-                # 确保物品不超出墙的范围
-                if dist + length_along_wall / 2 > wall_length or dist - length_along_wall / 2 < 0:
+            # 物品比整面墙还长时直接跳过
+            if 2 * half_along > wall_length:
+                continue
+            
+            for start, end in self._wall_free_intervals(wall_idx, 2 * offset):
+                # 确保物品不超出区间范围
+                lo, hi = start + half_along, end - half_along
+                if lo > hi:
                     continue
                 
-                # 物品中心位置（贴墙）
-                center_x = wall_x + perp_x * offset
-                center_y = wall_y + perp_y * offset
-                
-                candidates.append(((center_x, center_y), rotation))
+                # 采样点很少，用纯 Python 整数步循环，避免逐元素的 numpy 标量
+                # 沿墙方向尺寸为0的物品没有步长，只取区间两端和中点
+                step = 2 * half_along
+                n_samples = math.ceil((hi - lo) / step) if step > 0 else 0
+                dists = {round(lo + i * step, 6) for i in range(n_samples)}
+                dists.update((round(hi, 6), round((lo + hi) / 2, 6)))
+                for dist in sorted(dists):
+                    # 物品中心位置（贴墙）
+                    center_x = px + ux * dist + perp_x * offset
+                    center_y = py + uy * dist + perp_y * offset
+                    candidates.append(((center_x, center_y), rotation, wall_idx))
         
         return candidates
     
-    def _generate_interior_positions(self, item: Item) -> List[Tuple[Tuple[float, float], int]]:
+    def _generate_interior_positions(self, item: Item) -> List[Candidate]:
         """生成内部候选位置（网格采样）"""
-        candidates = []
-        
-        # 获取边界的包围盒
-        minx, miny, maxx, maxy = self.boundary_polygon.bounds
-        
-        # 网格步长 - 更密集的采样以提高成功率
-        step = 200
-        
-        for x in np.arange(minx, maxx, step):
-            for y in np.arange(miny, maxy, step):
-                # 检查点是否在多边形内
-                if self.boundary_polygon.contains(Point(x, y)):
-                    for rotation in [0, 90]:
-                        candidates.append(((x, y), rotation))
-        
-        return candidates
-    
-    def _calculate_position_score(self, center: Tuple[float, float], 
-                                  item: Item, rotation: int) -> float:
-        """计算位置得分（贴墙优先）"""
-        rect = self._create_rectangle(center, item.length, item.width, rotation)
-        score = 0.0
-        
-        # 计算贴墙数量
-        touching_walls = 0
-        min_wall_distance = float('inf')
-        
-        for wall in self.walls:
-            distance = rect.distance(wall)
-            min_wall_distance = min(min_wall_distance, distance)
+        # 网格只与边界有关，对所有物品复用
+        if self._interior_points is None:
+            # 获取边界的包围盒
+            minx, miny, maxx, maxy = self.boundary_bounds
             
-            if distance < 10:  # 容差范围内认为贴墙
-                touching_walls += 1
-        
-        # 贴墙数量权重最高
-        score += touching_walls * 10000
-        
-        # 距离墙越近越好
-        score -= min_wall_distance
+            # 网格步长 - 更密集的采样以提高成功率
+            step = 200
+            
+            xs, ys = np.meshgrid(np.arange(minx, maxx, step),
+                                 np.arange(miny, maxy, step), indexing='ij')
+            xs, ys = xs.ravel(), ys.ravel()
+            
+            # 批量检查点是否在多边形内
+            mask = shapely.contains_xy(self.boundary_polygon, xs, ys)
+            self._interior_points = list(zip(xs[mask].tolist(), ys[mask].tolist()))
         
-        return score
+        return [(pt, rotation, -1) for pt in self._interior_points for rotation in (0, 90)]
+    
+    def _placed_item_aabbs(self) -> np.ndarray:
+        """已摆放物品（不含冰箱开门边禁区）的包围盒 (N, 4)"""
+        return np.array([poly.bounds for poly in self.placed_polygons],
+                        dtype=np.float64).reshape(-1, 4)
+    
+    def _calculate_position_scores(self, aabbs: np.ndarray, source_walls: np.ndarray) -> np.ndarray:
+        """批量计算位置得分（贴墙优先），aabbs 形状为 (C, 4)"""
+        return self._combine_scores(*self._position_features(aabbs, source_walls))
+    
+    def _position_features(self, aabbs: np.ndarray,
+                           source_walls: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """批量计算评分特征 (贴墙数量, 齐平物品边数, 最近墙距离)，与 Numba 内核的结果一致
+        
+        source_walls 为每个候选的来源墙编号，沿墙生成的候选与来源墙的距离按构造为0。
+        """
+        distances = segment_to_aabb_distance(self.wall_segments, aabbs)
+        from_wall = source_walls >= 0
+        distances[from_wall, source_walls[from_wall]] = 0.0
+        
+        # 计算贴墙数量（容差范围内认为贴墙）
+        touching_walls = (distances < self.TOUCH_TOLERANCE).sum(axis=1)
+        min_wall_distance = distances.min(axis=1)
+        
+        # 计算与已摆放物品齐平的边数：一个轴上间隙在容差内，另一个轴上投影重叠
+        placed = self._placed_item_aabbs()
+        gap_x = np.maximum(placed[:, 0] - aabbs[:, 2:3], aabbs[:, 0:1] - placed[:, 2])
+        gap_y = np.maximum(placed[:, 1] - aabbs[:, 3:4], aabbs[:, 1:2] - placed[:, 3])
+        flush = (((gap_x < self.TOUCH_TOLERANCE) & (gap_y < 0)) |
+                 ((gap_y < self.TOUCH_TOLERANCE) & (gap_x < 0)))
+        touching_items = flush.sum(axis=1)
+        
+        return touching_walls, touching_items, min_wall_distance
+    
+    def _combine_scores(self, touching_walls: np.ndarray, touching_items: np.ndarray,
+                        min_wall_distance: np.ndarray) -> np.ndarray:
+        """由评分特征合成得分
+        
+        参考 WallE 的稳定性评分：贴墙边数权重最高，其次是与已摆放物品齐平的边数，
+        既不贴墙也不靠物品的孤立位置额外扣分。
+        """
+        isolated = (touching_walls == 0) & (touching_items == 0)
+        
+        # 贴墙数量权重最高，其次贴靠物品，距离墙越近越好
+        return (touching_walls * 10000.0 + touching_items * 1000.0
+                - isolated * 5000.0 - min_wall_distance)
     
     def _calculate_fridge_door_zone(self, placement: Placement) -> Optional[Polygon]:
         """计算冰箱开门边禁区"""
@@ -291,75 +533,197 @@ class PlacementSolver:
         
         if rotation == 0:
             # 开门边在右侧
-            zone_points = [
-                (cx + length/2, cy - width/2),
-                (cx + length/2 + door_clearance, cy - width/2),
-                (cx + length/2 + door_clearance, cy + width/2),
-                (cx + length/2, cy + width/2)
-            ]
+            return box(cx + length/2, cy - width/2,
+                       cx + length/2 + door_clearance, cy + width/2)
         else:  # rotation == 90
             # 开门边在上侧
-            zone_points = [
-                (cx - length/2, cy + width/2),
-                (cx + length/2, cy + width/2),
-                (cx + length/2, cy + width/2 + door_clearance),
-                (cx - length/2, cy + width/2 + door_clearance)
-            ]
+            return box(cx - length/2, cy + width/2,
+                       cx + length/2, cy + width/2 + door_clearance)
+    
+    def _generate_candidates(self, item: Item) -> Tuple[List[Candidate],
+                                                        List[Candidate]]:
+        """生成候选位置，返回 (沿墙位置, 内部位置)"""
+        wall_candidates = []
+        
+        # 优先尝试沿墙摆放
+        for wall_idx in range(len(self.walls)):
+            wall_candidates.extend(self._generate_wall_positions(wall_idx, item))
         
-        return Polygon(zone_points)
+        # 总是尝试内部位置以增加候选方案
+        interior_candidates = self._generate_interior_positions(item)
+        
+        return wall_candidates, interior_candidates
+    
+    def _interior_score_upper_bound(self, item: Item) -> float:
+        """内部网格候选得分的上界
+        
+        只排除超出边界包围盒或与已占用区域重叠的候选，不做精确的边界检查。墙面用其包围盒代替
+        （包围盒间隙不大于到线段的距离），齐平物品只要求两个轴上的间隙都在容差内，两者的计数只会偏多；
+        距离扣分和孤立扣分都不计入。
+        """
+        points = np.asarray(self._interior_points, dtype=np.float64).reshape(-1, 2)
+        half_l, half_w = item.length / 2, item.width / 2
+        aabbs = np.vstack([np.hstack([points - half, points + half])
+                           for half in ((half_l, half_w), (half_w, half_l))])
+        
+        bminx, bminy, bmaxx, bmaxy = self.boundary_bounds
+        inside = ((aabbs[:, 0] >= bminx) & (aabbs[:, 1] >= bminy) &
+                  (aabbs[:, 2] <= bmaxx) & (aabbs[:, 3] <= bmaxy))
+        aabbs = aabbs[inside]
+        aabbs = aabbs[~self._overlaps_placed(aabbs)]
+        if not len(aabbs):
+            return -np.inf
+        
+        walls = self.wall_segments
+        wall_aabbs = np.column_stack([np.minimum(walls[:, 0], walls[:, 2]), np.minimum(walls[:, 1], walls[:, 3]),
+                                      np.maximum(walls[:, 0], walls[:, 2]), np.maximum(walls[:, 1], walls[:, 3])])
+        counts = []
+        for boxes in (wall_aabbs, self._placed_item_aabbs()):
+            gap_x = np.maximum(boxes[:, 0] - aabbs[:, 2:3], aabbs[:, 0:1] - boxes[:, 2])
+            gap_y = np.maximum(boxes[:, 1] - aabbs[:, 3:4], aabbs[:, 1:2] - boxes[:, 3])
+            counts.append(((gap_x < self.TOUCH_TOLERANCE) & (gap_y < self.TOUCH_TOLERANCE)).sum(axis=1))
+        touching_walls, touching_items = counts
+        return float((touching_walls * 10000.0 + touching_items * 1000.0).max())
+    
+    def _new_frame(self, item: Item) -> CandidateFrame:
+        """为物品建立候选评估结果
+        
+        先只评估沿墙位置，内部网格位置只记下得分上界；剩余的沿墙位置得分低于该上界时，
+        _next_position 才评估内部位置，因此取出的位置与一次评估全部候选时相同。
+        """
+        wall_candidates, interior_candidates = self._generate_candidates(item)
+        frame = self._evaluate_positions(item, wall_candidates)
+        if interior_candidates:
+            frame.pending = interior_candidates
+            frame.pending_bound = self._interior_score_upper_bound(item)
+        return frame
+    
+    def _evaluate_positions(self, item: Item,
+                            candidates: List[Candidate]) -> CandidateFrame:
+        """筛选并评分候选位置"""
+        # 筛选有效位置：先批量排除与已摆放物品重叠的，再批量检查边界和门禁区
+        rect_aabb = self._rect_aabb_funcs(item)
+        aabbs = np.array([rect_aabb[rotation](*center)
+                          for center, rotation, _ in candidates], dtype=np.float64).reshape(-1, 4)
+        source_walls = np.array([wall_idx for _, _, wall_idx in candidates], dtype=np.int64)
+        kernel = _load_numba_kernel() if len(candidates) >= self.NUMBA_MIN_CANDIDATES else None
+        if kernel is not None:
+            # Numba 内核一次完成重叠筛选和评分特征计算
+            keep, touching_walls, touching_items, min_wall_distance = kernel(
+                aabbs, source_walls, self.placed_aabbs, self._placed_item_aabbs(),
+                np.asarray(self.boundary_bounds, dtype=np.float64),
+                self.wall_segments, float(self.TOUCH_TOLERANCE))
+        else:
+            keep = ~self._overlaps_placed(aabbs)
+        keep[keep] = self._fits_room(aabbs[keep])
+        valid_positions = [candidates[i] for i in np.flatnonzero(keep)]
+        
+        # 批量评分，得分相同时保持候选生成顺序
+        if kernel is not None:
+            scores = self._combine_scores(touching_walls[keep], touching_items[keep],
+                                          min_wall_distance[keep])
+        else:
+            scores = self._calculate_position_scores(aabbs[keep], source_walls[keep])
+        return CandidateFrame(valid_positions, aabbs[keep], scores)
+    
+    def _next_position(self, item: Item, frame: CandidateFrame) -> Optional[Tuple[float, Tuple[float, float], int]]:
+        """取出得分最高且尚未尝试的位置，得分相同时保持候选生成顺序
+        
+        只在需要时用 argmax 取下一个，不对全部候选排序；取出后屏蔽与之重合的候选，
+        每个物品最多尝试 MAX_ALTERNATIVES 个不同位置。
+        """
+        if len(frame.tried) >= self.MAX_ALTERNATIVES:
+            return None
+        
+        best_score = float(frame.scores.max()) if len(frame.scores) else -np.inf
+        if frame.pending is not None and best_score < frame.pending_bound:
+            # 内部位置可能得分更高：评估后接在沿墙位置之后，并屏蔽与已尝试位置重合的
+            extra = self._evaluate_positions(item, frame.pending)
+            for tried_box in frame.tried:
+                extra.scores[np.all(np.abs(extra.aabbs - tried_box) < 1e-6, axis=1)] = -np.inf
+            frame.positions = frame.positions + extra.positions
+            frame.aabbs = np.vstack([frame.aabbs, extra.aabbs])
+            frame.scores = np.concatenate([frame.scores, extra.scores])
+            frame.pending = None
+            return self._next_position(item, frame)
+        
+        if best_score == -np.inf:
+            return None
+        
+        best_idx = int(np.argmax(frame.scores))
+        frame.tried.append(frame.aabbs[best_idx])
+        frame.scores[np.all(np.abs(frame.aabbs - frame.aabbs[best_idx]) < 1e-6, axis=1)] = -np.inf
+        center, rotation, _ = frame.positions[best_idx]
+        return (best_score, center, rotation)
+    
+    def _place(self, item: Item, center: Tuple[float, float], rotation: int):
+        """记录一次摆放，并更新占用区域"""
+        placement = Placement(item, center, rotation)
+        self.placements.append(placement)
+        
+        # 添加到已摆放物品
+        placed_rect = self._create_rectangle(center, item.length, item.width, rotation)
+        self.placed_polygons.append(placed_rect)
+        self._add_placed_aabb(self._rect_aabb(center, item.length, item.width, rotation))
+        
+        # 如果是冰箱，添加开门边禁区
+        if item.item_type == "fridge":
+            fridge_zone = self._calculate_fridge_door_zone(placement)
+            if fridge_zone:
+                self.fridge_zones.append(fridge_zone)
+                self._add_placed_aabb(fridge_zone.bounds)
+    
+    def _remove_last_placement(self) -> Placement:
+        """撤销最后一次摆放"""
+        placement = self.placements.pop()
+        self.placed_polygons.pop()
+        removed = 1
+        if placement.item.item_type == "fridge" and self.fridge_zones:
+            self.fridge_zones.pop()
+            removed += 1
+        self.placed_aabbs = self.placed_aabbs[:-removed]
+        return placement
     
     def solve(self) -> Dict:
-        """求解摆放方案"""
-        for item in self.items:
-            print(f"正在摆放: {item.name} ({item.length} x {item.width})")
+        """求解摆放方案（贪心 + 有限深度回溯）"""
+        # 每层记录一个物品的候选评估结果
+        frames: List[CandidateFrame] = []
+        deepest = 0
+        best_partial: List[dict] = []
+        failed_item: Optional[Item] = None
+        
+        while len(self.placements) < len(self.items):
+            idx = len(self.placements)
+            item = self.items[idx]
             
-            # 生成候选位置
-            candidates = []
+            if len(frames) == idx:
+                print(f"正在摆放: {item.name} ({item.length} x {item.width})")
+                frames.append(self._new_frame(item))
             
-            # 优先尝试沿墙摆放
-            for wall in self.walls:
-                wall_candidates = self._generate_wall_positions(wall, item)
-                candidates.extend(wall_candidates)
-            
-            # 总是尝试内部位置以增加候选方案
-            interior_candidates = self._generate_interior_positions(item)
-            candidates.extend(interior_candidates)
-            
-            # 筛选有效位置
-            valid_positions = []
-            for center, rotation in candidates:
-                if self._is_valid_placement(center, item, rotation):
-                    score = self._calculate_position_score(center, item, rotation)
-                    valid_positions.append((score, center, rotation))
+            position = self._next_position(item, frames[idx])
+            if position is not None:
+                score, center, rotation = position
+                self._place(item, center, rotation)
+                print(f"  ✓ 摆放在 {center}, 旋转 {rotation}°, 得分 {score:.2f}")
+                
+                if len(self.placements) > deepest:
+                    deepest = len(self.placements)
+                    best_partial = [p.to_dict() for p in self.placements]
+                continue
             
-            # 如果没有有效位置，返回失败
-            if not valid_positions:
-                print(f"无法摆放 {item.name}")
+            # 当前物品无处可放：撤销上一个物品并尝试它的下一个位置，最多回溯 MAX_BACKTRACK_DEPTH 个物品
+            if idx == deepest:
+                failed_item = item
+            frames.pop()
+            if idx == 0 or idx <= deepest - self.MAX_BACKTRACK_DEPTH:
+                print(f"无法摆放 {failed_item.name}")
                 return {
                     "feasible": False,
-                    "placements": [p.to_dict() for p in self.placements],
-                    "message": f"无法摆放物品: {item.name}"
+                    "placements": best_partial,
+                    "message": f"无法摆放物品: {failed_item.name}"
                 }
-            
-            # 选择得分最高的位置
-            valid_positions.sort(key=lambda x: x[0], reverse=True)
-            best_score, best_center, best_rotation = valid_positions[0]
-            
-            # 创建摆放记录
-            placement = Placement(item, best_center, best_rotation)
-            self.placements.append(placement)
-            
-            # 添加到已摆放物品
-            placed_rect = self._create_rectangle(best_center, item.length, item.width, best_rotation)
-            self.placed_polygons.append(placed_rect)
-            
-            # 如果是冰箱，添加开门边禁区
-            if item.item_type == "fridge":
-                fridge_zone = self._calculate_fridge_door_zone(placement)
-                if fridge_zone:
-                    self.fridge_zones.append(fridge_zone)
-            
-            print(f"  ✓ 摆放在 {best_center}, 旋转 {best_rotation}°, 得分 {best_score:.2f}")
+            undone = self._remove_last_placement()
+            print(f"  ↺ 回溯: 撤销 {undone.item.name}")
         
         return {
             "feasible": True,
@@ -1,49 +1,70 @@
 """
 批量运行所有示例
 """
+import contextlib
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 批量模式只保存图片，必须在导入 pyplot 之前选择非交互后端
+import matplotlib
+matplotlib.use("Agg")
+
 from placement_solver import solve_placement
 from visualizer import visualize_placement
 
 
-def run_all_examples():
-    """运行所有示例文件"""
-    examples = [
-        ("example1.json", "output1.json", "result1.png"),
-        ("example2.json", "output2.json", "result2.png"),
-        ("example3.json", "output3.json", "result3.png"),
-        ("example4.json", "output4.json", "result4.png"),
-    ]
-    
-    print("=" * 60)
-    print("开始批量处理示例")
-    print("=" * 60)
-    
-    for input_file, output_file, image_file in examples:
+def _run_one(paths) -> str:
+    """处理单个示例，返回该示例的全部输出文本"""
+    input_file, output_file, image_file = paths
+    log = io.StringIO()
+
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
         if not os.path.exists(input_file):
             print(f"\n跳过 {input_file} (文件不存在)")
-            continue
-        
+            return log.getvalue()
+
         print(f"\n{'=' * 60}")
         print(f"处理: {input_file}")
         print(f"{'=' * 60}")
-        
+
         try:
             # 求解
             result = solve_placement(input_file, output_file)
-            
+
             # 可视化
             if result['feasible']:
                 visualize_placement(input_file, output_file, image_file)
                 print(f"✓ 成功生成可视化: {image_file}")
             else:
                 print(f"✗ 摆放不可行，跳过可视化")
-        
+
         except Exception as e:
             print(f"✗ 处理失败: {str(e)}")
             import traceback
             traceback.print_exc()
-    
+
+    return log.getvalue()
+
+
+def run_all_examples():
+    """运行所有示例文件（各示例相互独立，使用多进程并行处理）"""
+    examples = [
+        ("example1.json", "output1.json", "result1.png"),
+        ("example2.json", "output2.json", "result2.png"),
+        ("example3.json", "output3.json", "result3.png"),
+        ("example4.json", "output4.json", "result4.png"),
+    ]
+
+    print("=" * 60)
+    print("开始批量处理示例")
+    print("=" * 60)
+
+    # pyplot 的状态是进程级全局的，因此用进程而不是线程；输出按示例顺序打印
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        for log in executor.map(_run_one, examples):
+            print(log, end="")
+
     print(f"\n{'=' * 60}")
     print("批量处理完成")
     print(f"{'=' * 60}")
@@ -0,0 +1,91 @@
+"""
+Numba 内核与 numpy 实现的一致性测试
+"""
+import contextlib
+import io
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+import placement_solver
+from _kernels import evaluate_candidates
+from placement_solver import PlacementSolver
+
+
+EXAMPLES = ["example1.json", "example2.json", "example3.json", "example4.json"]
+
+
+def _load_solver(input_file: str) -> PlacementSolver:
+    with open(input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return PlacementSolver(boundary=data['boundary'], door=data['door'],
+                           is_open_inward=data['isOpenInward'], items=data['algoToPlace'])
+
+
+def _assert_paths_agree(solver: PlacementSolver, aabbs: np.ndarray, source_walls: np.ndarray):
+    """比较内核与 numpy 实现的包围盒筛选结果和评分特征"""
+    valid, touching_walls, touching_items, min_wall_distance = evaluate_candidates(
+        aabbs, source_walls, solver.placed_aabbs, solver._placed_item_aabbs(),
+        np.asarray(solver.boundary_bounds, dtype=np.float64),
+        solver.wall_segments, float(solver.TOUCH_TOLERANCE))
+
+    bminx, bminy, bmaxx, bmaxy = solver.boundary_bounds
+    in_bounds = ((aabbs[:, 0] >= bminx) & (aabbs[:, 1] >= bminy) &
+                 (aabbs[:, 2] <= bmaxx) & (aabbs[:, 3] <= bmaxy))
+    expected_valid = in_bounds & ~solver._overlaps_placed(aabbs)
+    np.testing.assert_array_equal(valid, expected_valid)
+
+    expected = solver._position_features(aabbs[valid], source_walls[valid])
+    np.testing.assert_array_equal(touching_walls[valid], expected[0])
+    np.testing.assert_array_equal(touching_items[valid], expected[1])
+    np.testing.assert_allclose(min_wall_distance[valid], expected[2], atol=1e-6)
+
+
+@pytest.mark.parametrize("input_file", EXAMPLES)
+def test_kernel_matches_numpy_on_examples(input_file):
+    """在示例摆放完成一半时，对下一个物品的全部候选比较两种实现"""
+    solver = _load_solver(input_file)
+    for item in solver.items[:len(solver.items) // 2]:
+        wall_candidates, interior_candidates = solver._generate_candidates(item)
+        frame = solver._evaluate_positions(item, wall_candidates + interior_candidates)
+        center, rotation, _ = frame.positions[int(np.argmax(frame.scores))]
+        solver._place(item, center, rotation)
+
+    item = solver.items[len(solver.items) // 2]
+    wall_candidates, interior_candidates = solver._generate_candidates(item)
+    candidates = wall_candidates + interior_candidates
+    rect_aabb = solver._rect_aabb_funcs(item)
+    aabbs = np.array([rect_aabb[rotation](*center) for center, rotation, _ in candidates])
+    source_walls = np.array([wall_idx for _, _, wall_idx in candidates], dtype=np.int64)
+    _assert_paths_agree(solver, aabbs, source_walls)
+
+
+def test_kernel_matches_numpy_on_random_boxes():
+    """斜墙、随机已摆放物品和随机候选包围盒"""
+    rng = np.random.default_rng(0)
+    boundary = [(0, 0), (6000, 0), (6000, 3000), (4000, 5000), (0, 5000)]
+    solver = PlacementSolver(boundary, [(1000, 0), (1800, 0)], True,
+                             {"shelf-1": [1200, 500]})
+    for x, y in rng.uniform(500, 3500, size=(6, 2)):
+        solver._add_placed_aabb((x, y, x + 600, y + 400))
+        solver.placed_polygons.append(placement_solver.box(x, y, x + 600, y + 400))
+
+    corners = rng.uniform(-200, 6000, size=(2000, 2))
+    sizes = rng.uniform(0, 1500, size=(2000, 2))
+    aabbs = np.hstack([corners, corners + sizes])
+    source_walls = rng.integers(-1, len(boundary), size=2000)
+    _assert_paths_agree(solver, aabbs, source_walls)
+
+
+@pytest.mark.parametrize("input_file", EXAMPLES)
+def test_solve_same_with_and_without_kernel(input_file, monkeypatch):
+    """整体求解结果与是否使用内核无关"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        monkeypatch.setattr(PlacementSolver, "NUMBA_MIN_CANDIDATES", 0)
+        with_kernel = _load_solver(input_file).solve()
+        monkeypatch.setattr(PlacementSolver, "NUMBA_MIN_CANDIDATES", float("inf"))
+        without_kernel = _load_solver(input_file).solve()
+    assert with_kernel == without_kernel
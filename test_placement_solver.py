@@ -0,0 +1,19 @@
+"""
+求解器沿墙采样的测试
+"""
+from placement_solver import PlacementSolver
+
+
+def test_slanted_door_only_blocks_its_own_zone():
+    """斜墙上的门：门禁区包围盒覆盖的相邻墙段，只有与门禁区真正相交的部分被占用"""
+    boundary = [(0, 0), (4000, 0), (4000, 2000), (3000, 3000), (0, 3000)]
+    solver = PlacementSolver(boundary, [(3800, 2200), (3234.3, 2765.7)], True,
+                             {"shelf-1": [1000, 500]})
+    assert not solver.door_is_rect
+
+    # 顶墙 (3000, 3000) -> (0, 3000)，深 500 的条带：门禁区包围盒占到 x = 2668.6，
+    # 门禁区本身只伸进条带的 x > 2968.6 部分
+    (start, end), = solver._wall_free_intervals(3, 500)
+    assert abs(start - 31.4) < 1e-6 and end == 3000.0
+    centers = [center for center, _, _ in solver._generate_wall_positions(3, solver.items[0])]
+    assert any(abs(x - 2468.6) < 1e-6 and abs(y - 2750) < 1e-6 for x, y in centers)
@@ -2,8 +2,10 @@
 可视化工具：绘制摆放结果
 """
 import json
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
 from matplotlib.patches import Polygon as MPLPolygon
 import numpy as np
 import warnings
@@ -66,7 +68,10 @@ def visualize_placement(input_file: str, output_file: str, save_image: str = Non
         'overShelf': '#FFA07A'
     }
     
-    # 绘制摆放的物品
+    # 绘制摆放的物品：先收集所有矩形，最后用一个 PatchCollection 统一绘制
+    item_rects = []
+    item_colors = []
+    fridge_door_zones = []
     if output_data['feasible']:
         for placement in output_data['placements']:
             item_name = placement['item']
@@ -91,12 +96,11 @@ def visualize_placement(input_file: str, output_file: str, save_image: str = Non
             else:
                 rect_width, rect_height = width, length
             
-            rect = patches.Rectangle(
+            item_rects.append(patches.Rectangle(
                 (center[0] - rect_width/2, center[1] - rect_height/2),
-                rect_width, rect_height,
-                linewidth=2, edgecolor='black', facecolor=color, alpha=0.7
-            )
-            ax.add_patch(rect)
+                rect_width, rect_height
+            ))
+            item_colors.append(color)
             
             # 添加标签
             ax.text(center[0], center[1], item_name, 
@@ -122,10 +126,15 @@ def visualize_placement(input_file: str, output_file: str, save_image: str = Non
                         (center[0] - length/2, center[1] + width/2 + door_clearance)
                     ]
                 
-                fridge_door_zone = MPLPolygon(door_zone_points, fill=True, 
-                                              facecolor='yellow', alpha=0.2, 
-                                              edgecolor='orange', linestyle=':')
-                ax.add_patch(fridge_door_zone)
+                fridge_door_zones.append(MPLPolygon(door_zone_points))
+    
+    if item_rects:
+        ax.add_collection(PatchCollection(item_rects, facecolors=item_colors, edgecolors='black',
+                                          alpha=0.7, linewidths=2))
+    if fridge_door_zones:
+        ax.add_collection(PatchCollection(fridge_door_zones, facecolors='yellow', edgecolors='orange',
+                                          alpha=0.2, linestyles=':'))
+    ax.autoscale_view()
     
     # 设置坐标轴
     ax.set_aspect('equal')
@@ -152,6 +161,7 @@ def visualize_placement(input_file: str, output_file: str, save_image: str = Non
     # 保存或显示
     if save_image:
         plt.savefig(save_image, dpi=150, bbox_inches='tight')
+        plt.close(fig)
         print(f"图像已保存到: {save_image}")
     else:
         plt.show()
@@ -170,4 +180,8 @@ if __name__ == "__main__":
         output_file = "output1.json"
         save_image = "result1.png"
     
+    # 只保存图片时使用非交互后端，省去交互窗口的开销（在入口处选择，不影响作为模块调用的程序）
+    if save_image:
+        matplotlib.use("Agg")
+    
     visualize_placement(input_file, output_file, save_image)